@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+from importlib import import_module
+from .core import prettyRange, ARange, SRange
+from .backends import set_backend, get_backend, get_backend_name, available_backends
+
+# Everything else is imported from its submodule when first used, so that "import ranges" stays fast:
+_lazy = {
+    'Profile': 'profiling',
+    'profile': 'profiling',
+    'fingerprint': 'index',
+    'RangeIndex': 'index',
+    'RangeCache': 'index',
+    'AsyncRangeStore': 'aio',
+    'RangeBitmap': 'bitmap',
+    'ARangeArray': 'arrays',
+    'SharedRangeIndex': 'shared'
+}
+
+__all__ = ['prettyRange', 'ARange', 'SRange', 'set_backend', 'get_backend', 'get_backend_name', 'available_backends'] + list(_lazy.keys())
+
+def __getattr__(name):
+    """Import the submodule defining name when it is first used."""
+    module = _lazy.get(name)
+    if module is None: raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    """List the module attributes, including those not yet imported."""
+    return sorted(set(globals().keys()) | set(_lazy.keys()))
@@ -0,0 +1,237 @@
+import asyncio
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from .core import ARange, _trustedARange
+from .index import RangeIndex, _applyOperation
+
+def _snapshot(r):
+    """
+    Return a shallow copy of the atomic ranges of an (S|A)Range (or the RangeIndex itself) for use in another thread.
+    Copying the list is much cheaper than building a RangeIndex, so this can be done on the event loop thread.
+    """
+    if isinstance(r, RangeIndex): return r
+    return [a.copy() for a in r.ranges] if isinstance(r, ARange) else list(r.ranges)
+
+def _indexFromRanges(ranges):
+    """Return a RangeIndex from a snapshot returned by _snapshot()."""
+    if isinstance(ranges, RangeIndex): return ranges
+    output = RangeIndex()
+    for r in ranges:
+        if r.empty is True: continue
+        output._starts.append(r.start)
+        output._ends.append(r.end)
+    return output
+
+def _applyIndexedOperation(op, a, b):
+    """Return the result of a binary operation between a RangeIndex and a snapshot returned by _snapshot()."""
+    return _applyOperation(op, a, _indexFromRanges(b))
+
+class AsyncRangeStore(object):
+    """
+    The AsyncRangeStore class serves queries against a set of named ranges from an asyncio event loop.
+    Each stored range is held as an immutable RangeIndex, so queries can safely run in worker threads.
+    Point and overlap queries made in the same event loop iteration are answered together by a single batched lookup.
+    Binary operations are run in a bounded thread pool so that large operations do not block the event loop.
+    Query operands are indexed in the thread pool from a shallow copy of their ranges, so they must not be changed in place until the query completes.
+    """
+    operations = ('and', 'or', 'sub', 'xor')
+
+    def __init__(self, ranges=None, max_workers=4, max_pending=None, executor=None):
+        """
+        Initialize an AsyncRangeStore object, optionally from a dictionary of named (S|A)Range objects.
+        At most max_pending jobs (default: four per worker) are submitted to the executor at once.
+        If no executor is given, a ThreadPoolExecutor with max_workers threads is created and closed with the store.
+        """
+        super().__init__()
+        self._indexes = {}
+        self._owns_executor = executor is None
+        if executor is None: executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._executor = executor
+        if max_pending is None: max_pending = 4 * max_workers
+        self._max_pending = max_pending
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._pending = {}
+        self._tasks = set()
+        self._flush_scheduled = False
+        self.resetMetrics()
+        if ranges is not None:
+            for name, r in ranges.items(): self.add(name, r)
+
+    def add(self, name, r):
+        """Add (or replace) a named range in the store. The range is copied, so later changes to r do not affect the store."""
+        if not isinstance(r, RangeIndex): r = RangeIndex(r)
+        self._indexes[name] = r
+
+    def remove(self, name):
+        """Remove a named range from the store."""
+        del self._indexes[name]
+
+    def get(self, name):
+        """Return the RangeIndex stored under name."""
+        return self._indexes[name]
+
+    def names(self):
+        """Return the names of the stored ranges as a list."""
+        return list(self._indexes.keys())
+
+    def resetMetrics(self):
+        """Clear all recorded latency metrics."""
+        self._latency = {}
+        self._batches = {'count': 0, 'queries': 0, 'max_size': 0}
+
+    def _record(self, op, elapsed):
+        """Record the latency of a single query."""
+        stats = self._latency.get(op)
+        if stats is None:
+            stats = {'count': 0, 'total': 0.0, 'max': 0.0}
+            self._latency[op] = stats
+        stats['count'] += 1
+        stats['total'] += elapsed
+        stats['max'] = max(stats['max'], elapsed)
+
+    def getMetrics(self):
+        """Return the latency (in seconds) of each query type and the batching statistics as a dictionary."""
+        output = {}
+        for op, stats in self._latency.items():
+            output[op] = dict(stats)
+            output[op]['mean'] = stats['total'] / stats['count']
+        output['batches'] = dict(self._batches)
+        return output
+
+    async def _run(self, fun, *args):
+        """Run fun(*args) in the executor, waiting if max_pending jobs from the running event loop are already running."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_pending)
+            self._semaphores[loop] = semaphore
+        async with semaphore:
+            return await loop.run_in_executor(self._executor, fun, *args)
+
+    def _query(self, kind, name, query):
+        """Queue a point or overlap query to be answered in the next batch, returning a future for the result."""
+        index = self._indexes[name]
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(index, []).append((kind, query, future, time.perf_counter()))
+        if self._flush_scheduled is False:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        """Answer all queued queries, with one batched lookup per stored range."""
+        self._flush_scheduled = False
+        pending = self._pending
+        self._pending = {}
+        for index, batch in pending.items():
+            self._batches['count'] += 1
+            self._batches['queries'] += len(batch)
+            self._batches['max_size'] = max(self._batches['max_size'], len(batch))
+            task = asyncio.ensure_future(self._answer(index, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _lookup(index, batch):
+        """
+        Return the results of a batch of point and overlap queries against an index.
+        All point queries are answered by one call to findMany, and the segments of all overlap queries by one call to overlapSlices.
+        """
+        points = [query for kind, query, future, start in batch if kind == 'contains']
+        found = iter(index.findMany(points))
+        queries = [_indexFromRanges(query) for kind, query, future, start in batch if kind == 'overlapping']
+        pairs = [pair for q in queries for pair in zip(q._starts, q._ends)]
+        slices = iter(index.overlapSlices(pairs))
+        queries = iter(queries)
+        output = []
+        for kind, query, future, start in batch:
+            if kind == 'contains':
+                output.append(next(found) >= 0)
+                continue
+            ranges = []
+            last = -1
+            for j in range(next(queries).segments):
+                i0, i1 = next(slices)
+                for i in range(max(i0, last + 1), i1):
+                    ranges.append(_trustedARange(index._starts[i], index._ends[i]))
+                    last = i
+            output.append(ranges)
+        return output
+
+    async def _answer(self, index, batch):
+        """Run a batch of queries in the executor and set the result of each query's future."""
+        try: results = await self._run(self._lookup, index, batch)
+        except Exception as e:
+            for kind, query, future, start in batch:
+                if not future.done(): future.set_exception(e)
+            return
+        for (kind, query, future, start), result in zip(batch, results):
+            if future.done(): continue
+            future.set_result(result)
+            self._record(kind, time.perf_counter() - start)
+
+    async def contains(self, name, value):
+        """Test if value is contained in the named range."""
+        return await self._query('contains', name, int(value))
+
+    async def overlapping(self, name, other):
+        """Return the atomic ranges of the named range that overlap an (S|A)Range as a list of ARange objects."""
+        return await self._query('overlapping', name, _snapshot(other))
+
+    async def apply(self, op, name, other):
+        """
+        Return the result of a binary operation between the named range and another range as a new SRange.
+        The operation is one of 'and', 'or', 'sub' or 'xor', and other is either an (S|A)Range or the name of a stored range.
+        """
+        if op not in self.operations: raise ValueError('unknown operation "{}"'.format(op))
+        start = time.perf_counter()
+        a = self._indexes[name]
+        if isinstance(other, str): b = self._indexes[other]
+        else: b = _snapshot(other)
+        result = await self._run(_applyIndexedOperation, op, a, b)
+        self._record(op, time.perf_counter() - start)
+        return result
+
+    async def intersection(self, name, other):
+        """Return the intersection of the named range with another range."""
+        return await self.apply('and', name, other)
+
+    async def union(self, name, other):
+        """Return the union of the named range with another range."""
+        return await self.apply('or', name, other)
+
+    async def difference(self, name, other):
+        """Return the difference of the named range with another range."""
+        return await self.apply('sub', name, other)
+
+    async def symmetricDifference(self, name, other):
+        """Return the exclusive disjunction of the named range with another range."""
+        return await self.apply('xor', name, other)
+
+    def close(self):
+        """Shut down the executor if it was created by the store, waiting for running jobs to finish."""
+        if self._owns_executor: self._executor.shutdown(wait=True)
+
+    async def aclose(self):
+        """Shut down the executor if it was created by the store, waiting for running jobs to finish without blocking the event loop."""
+        if self._owns_executor: await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+
+    async def __aenter__(self):
+        """Enter an async with block, returning the store."""
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Close the store on leaving an async with block."""
+        await self.aclose()
+
+    def __contains__(self, name):
+        """Test if a range is stored under name."""
+        return name in self._indexes
+
+    def __len__(self):
+        """Return the number of stored ranges."""
+        return len(self._indexes)
+
+    metrics = property(getMetrics, None, doc='The latency metrics of the AsyncRangeStore.')
@@ -0,0 +1,291 @@
+import numpy
+from .core import ARange
+
+def _columns(x):
+    """Return the (starts, ends, empty) columns of an ARangeArray, or of an ARange as zero-dimensional arrays for broadcasting."""
+    if isinstance(x, ARangeArray): return (x._starts, x._ends, x._empty)
+    if isinstance(x, ARange):
+        if x.empty: return (numpy.int64(0), numpy.int64(0), numpy.bool_(True))
+        return (numpy.int64(x.start), numpy.int64(x.end), numpy.bool_(False))
+    raise TypeError('expected an ARangeArray or ARange, not {}'.format(type(x).__name__))
+
+class ARangeArray(object):
+    """
+    The ARangeArray class represents an array of independent ARanges in columnar form.
+    The start and end values are held in two NumPy int64 arrays, and empty ARanges are marked by a boolean mask (their start and end values are ignored).
+    Element-wise methods mirror those of ARange, and binary methods accept either another ARangeArray of the same length or a single ARange (which is broadcast).
+    Where an ARange operation can return an SRange (such as union or difference), the ARangeArray method returns the lower and upper pieces as separate arrays; join() combines them.
+    """
+    @classmethod
+    def fromList(cls, l):
+        """Initialize an ARangeArray object from a list of ARange objects."""
+        l = list(l)
+        for r in l:
+            if not isinstance(r, ARange): raise TypeError('expected a list of ARange objects, not {}'.format(type(r).__name__))
+        empty = numpy.array([r.empty for r in l], dtype=bool)
+        starts = numpy.array([0 if r.empty else r.start for r in l], dtype=numpy.int64)
+        ends = numpy.array([0 if r.empty else r.end for r in l], dtype=numpy.int64)
+        return cls._fromColumns(starts, ends, empty)
+
+    @classmethod
+    def _fromColumns(cls, starts, ends, empty):
+        """Return a new ARangeArray from columns that are already known to be valid (i.e. positive, with start <= end where not empty)."""
+        output = cls.__new__(cls)
+        empty = numpy.array(empty, dtype=bool)
+        output._empty = empty
+        output._starts = numpy.where(empty, 0, starts).astype(numpy.int64)
+        output._ends = numpy.where(empty, 0, ends).astype(numpy.int64)
+        return output
+
+    def __init__(self, starts=(), ends=None, empty=None):
+        """
+        Initialize an ARangeArray object from arrays of start and end values, as ARange(start, end) would be for each element.
+        If ends is None, then each ARange contains a single value. Start and end values are sorted, and must be positive where the element is not empty.
+        """
+        super().__init__()
+        starts = numpy.asarray(starts, dtype=numpy.int64).reshape(-1)
+        if ends is None: ends = starts
+        ends = numpy.asarray(ends, dtype=numpy.int64).reshape(-1)
+        if len(ends) != len(starts): raise ValueError('starts and ends must have the same length')
+        if empty is None: empty = numpy.zeros(len(starts), dtype=bool)
+        empty = numpy.asarray(empty, dtype=bool).reshape(-1)
+        if len(empty) != len(starts): raise ValueError('empty must have the same length as starts')
+        self._empty = empty.copy()
+        self._starts = numpy.where(empty, 0, numpy.minimum(starts, ends))
+        self._ends = numpy.where(empty, 0, numpy.maximum(starts, ends))
+        self._validate()
+
+    def _validate(self):
+        """Check that every non-empty element has positive values."""
+        if numpy.any(~self._empty & (self._starts <= 0)): raise ValueError('ARange values must be positive')
+
+    def _result(self, starts, ends, empty):
+        """Return a new ARangeArray of the given (broadcast) columns, raising ValueError as ARange would for non-positive values."""
+        shape = numpy.broadcast(starts, ends, empty, self._empty).shape
+        output = ARangeArray._fromColumns(numpy.broadcast_to(starts, shape), numpy.broadcast_to(ends, shape), numpy.broadcast_to(empty, shape))
+        output._validate()
+        return output
+
+    def getStarts(self):
+        """Return the start values as an array (with 0 for empty elements)."""
+        return self._starts
+
+    def getEnds(self):
+        """Return the end values as an array (with 0 for empty elements)."""
+        return self._ends
+
+    def getEmpty(self):
+        """Return the mask of empty elements as a boolean array."""
+        return self._empty
+
+    def copy(self):
+        """Return a copy of the ARangeArray object."""
+        return ARangeArray._fromColumns(self._starts.copy(), self._ends.copy(), self._empty.copy())
+
+    def toList(self):
+        """Return the elements as a list of ARange objects."""
+        return [ARange() if e else ARange(s, t) for s, t, e in zip(self._starts.tolist(), self._ends.tolist(), self._empty.tolist())]
+
+    def lengths(self):
+        """Return the length of each element (i.e. the number of values it contains) as an array."""
+        return numpy.where(self._empty, 0, self._ends - self._starts + 1)
+
+    def translate(self, n):
+        """
+        Return a new ARangeArray with each element translated by n (a single value or an array).
+        A positive value of n will shift the range to the right, whilst a negative value will shift to the left.
+        """
+        n = numpy.asarray(n, dtype=numpy.int64)
+        return self._result(self._starts + n, self._ends + n, self._empty)
+
+    def expand(self, start, end=None):
+        """
+        Expand each element, optionally by different amounts left and right (single values or arrays).
+        Elements that would have an end before their start become empty; empty elements stay empty.
+        """
+        if end is None: end = start
+        new_start = self._starts - numpy.asarray(start, dtype=numpy.int64)
+        new_end = self._ends + numpy.asarray(end, dtype=numpy.int64)
+        return self._result(new_start, new_end, self._empty | (new_end < new_start))
+
+    def split(self, n):
+        """
+        Split each element into two at a given position (a single value or an array), returning a tuple of two ARangeArrays (possibly with empty elements).
+        The given value is included in the second ARangeArray.
+        """
+        n = numpy.asarray(n, dtype=numpy.int64)
+        left = self._result(self._starts, numpy.minimum(self._ends, n - 1), self._empty | (n <= self._starts))
+        right = self._result(numpy.maximum(self._starts, n), self._ends, self._empty | (n > self._ends))
+        return (left, right)
+
+    def distance(self, other):
+        """
+        Return the minimum distance between each element and other as a masked array (masked where either range is empty).
+        For overlapping elements, the distance is -1.
+        """
+        starts, ends, empty = _columns(other)
+        d = numpy.maximum(starts - self._ends - 1, self._starts - ends - 1)
+        d = numpy.where(d < 0, -1, d)
+        return numpy.ma.masked_array(d, mask=numpy.broadcast_to(self._empty | empty, d.shape))
+
+    def overlaps(self, other):
+        """Test if each element overlaps other, returning a boolean array."""
+        starts, ends, empty = _columns(other)
+        return ~self._empty & ~empty & (self._starts <= ends) & (starts <= self._ends)
+
+    def __and__(self, other):
+        """Return the element-wise intersection with another ARangeArray or ARange."""
+        if not (isinstance(other, ARangeArray) or isinstance(other, ARange)): return NotImplemented
+        starts, ends, empty = _columns(other)
+        return self._result(numpy.maximum(self._starts, starts), numpy.minimum(self._ends, ends), ~self.overlaps(other))
+
+    def __rand__(self, other):
+        """Return the element-wise intersection of an ARange with self."""
+        return self.__and__(other)
+
+    def union(self, other):
+        """
+        Return the element-wise union with another ARangeArray or ARange as a tuple of two ARangeArrays.
+        Where the union is a single range it is held in the first array; where the ranges are separated, the lower is in the first array and the upper in the second.
+        """
+        starts, ends, empty = _columns(other)
+        separate = ~self._empty & ~empty & ((starts - self._ends > 1) | (self._starts - ends > 1))
+        other_first = separate & (starts < self._starts)
+        lower_starts = numpy.where(self._empty, starts, numpy.where(empty, self._starts, numpy.minimum(self._starts, starts)))
+        lower_ends = numpy.where(self._empty, ends, numpy.where(empty, self._ends, numpy.maximum(self._ends, ends)))
+        lower_starts = numpy.where(separate, numpy.where(other_first, starts, self._starts), lower_starts)
+        lower_ends = numpy.where(separate, numpy.where(other_first, ends, self._ends), lower_ends)
+        lower = self._result(lower_starts, lower_ends, self._empty & empty)
+        upper = self._result(numpy.where(other_first, self._starts, starts), numpy.where(other_first, self._ends, ends), ~separate)
+        return (lower, upper)
+
+    def leftOverhang(self, other):
+        """Return the values of each element that are less than the start of other."""
+        starts, ends, empty = _columns(other)
+        return self._result(self._starts, numpy.minimum(self._ends, starts - 1), self._empty | empty | (starts <= self._starts))
+
+    def rightOverhang(self, other):
+        """Return the values of each element that are greater than the end of other."""
+        starts, ends, empty = _columns(other)
+        return self._result(numpy.maximum(self._starts, ends + 1), self._ends, self._empty | empty | (ends >= self._ends))
+
+    def difference(self, other):
+        """
+        Return the element-wise difference with another ARangeArray or ARange as a tuple of two ARangeArrays.
+        The first array holds the values below other, and the second the values above it.
+        """
+        starts, ends, empty = _columns(other)
+        overlapping = self.overlaps(other)
+        lower = self._result(self._starts, numpy.where(overlapping, numpy.minimum(self._ends, starts - 1), self._ends), self._empty | (overlapping & (starts <= self._starts)))
+        upper = self._result(numpy.maximum(self._starts, ends + 1), self._ends, ~overlapping | (ends >= self._ends))
+        return (lower, upper)
+
+    def symmetricDifference(self, other):
+        """
+        Return the element-wise exclusive disjunction with another ARangeArray or ARange as a tuple of two ARangeArrays.
+        The first array holds the lower piece and the second the upper piece (either of which may be empty).
+        """
+        starts, ends, empty = _columns(other)
+        overlapping = self.overlaps(other)
+        lower, upper = self.union(other)
+        low_start = numpy.minimum(self._starts, starts)
+        high_start = numpy.maximum(self._starts, starts)
+        low_end = numpy.minimum(self._ends, ends)
+        high_end = numpy.maximum(self._ends, ends)
+        lower = self._result(numpy.where(overlapping, low_start, lower._starts), numpy.where(overlapping, high_start - 1, lower._ends), numpy.where(overlapping, low_start == high_start, lower._empty))
+        upper = self._result(numpy.where(overlapping, low_end + 1, upper._starts), numpy.where(overlapping, high_end, upper._ends), numpy.where(overlapping, low_end == high_end, upper._empty))
+        return (lower, upper)
+
+    def removeAtomic(self, other):
+        """Remove other from each element, shifting the right-hand overlaps left. The pieces are returned as a tuple of two ARangeArrays."""
+        starts, ends, empty = _columns(other)
+        n = numpy.where(empty, 0, ends - starts + 1)
+        return (self.leftOverhang(other), self.rightOverhang(other).translate(-n))
+
+    def insertAtomic(self, other):
+        """Insert other into each element, shifting the right-hand overlaps right. The pieces are returned as a tuple of three ARangeArrays."""
+        starts, ends, empty = _columns(other)
+        n = numpy.where(empty, 0, ends - starts + 1)
+        left, right = self.split(starts)
+        inserted = self._result(starts, ends, empty)
+        return (left, inserted, right.translate(n))
+
+    @staticmethod
+    def join(*pieces):
+        """Return the element-wise union of ARangeArrays (such as those returned by union or difference) as a list of ARange or SRange objects."""
+        output = []
+        for elements in zip(*[p.toList() for p in pieces]):
+            result = elements[0]
+            for r in elements[1:]: result = result | r
+            output.append(result)
+        return output
+
+    def equals(self, other):
+        """Test each element for equality with other, returning a boolean array."""
+        starts, ends, empty = _columns(other)
+        return (self._empty & empty) | (~self._empty & ~empty & (self._starts == starts) & (self._ends == ends))
+
+    def issubset(self, other):
+        """Test if each element is a subset of other, returning a boolean array."""
+        starts, ends, empty = _columns(other)
+        return self._empty | (~empty & (self._starts >= starts) & (self._ends <= ends))
+
+    def issuperset(self, other):
+        """Test if each element is a superset of other, returning a boolean array."""
+        starts, ends, empty = _columns(other)
+        return empty | (~self._empty & (starts >= self._starts) & (ends <= self._ends))
+
+    def __eq__(self, other):
+        """Test each element for equality with another ARangeArray or ARange, returning a boolean array."""
+        if not (isinstance(other, ARangeArray) or isinstance(other, ARange)): return NotImplemented
+        return self.equals(other)
+
+    def __ne__(self, other):
+        """Test each element for inequality with another ARangeArray or ARange, returning a boolean array."""
+        if not (isinstance(other, ARangeArray) or isinstance(other, ARange)): return NotImplemented
+        return ~self.equals(other)
+
+    def __le__(self, other):
+        """Test if each element is a subset of other, returning a boolean array."""
+        return self.issubset(other)
+
+    def __ge__(self, other):
+        """Test if each element is a superset of other, returning a boolean array."""
+        return self.issuperset(other)
+
+    def __lt__(self, other):
+        """Test if each element is a proper subset of other, returning a boolean array."""
+        return self.issubset(other) & ~self.equals(other)
+
+    def __gt__(self, other):
+        """Test if each element is a proper superset of other, returning a boolean array."""
+        return self.issuperset(other) & ~self.equals(other)
+
+    __hash__ = None
+
+    def __getitem__(self, key):
+        """Return a single element as an ARange, or a new ARangeArray for a slice, mask or index array."""
+        if isinstance(key, (int, numpy.integer)):
+            if self._empty[key]: return ARange()
+            return ARange(int(self._starts[key]), int(self._ends[key]))
+        return ARangeArray._fromColumns(self._starts[key], self._ends[key], self._empty[key])
+
+    def __iter__(self):
+        """Iterate over the elements as ARange objects."""
+        return iter(self.toList())
+
+    def __len__(self):
+        """Return the number of elements in the ARangeArray."""
+        return len(self._starts)
+
+    def __str__(self):
+        """Return a string representation of an ARangeArray."""
+        return '[{}]'.format(', '.join(str(r) for r in self.toList()))
+
+    def __repr__(self):
+        """Show the code that would regenerate the ARangeArray."""
+        return 'ARangeArray.fromList({})'.format(repr(self.toList()))
+
+    starts = property(getStarts, None, doc='The start values of the ARangeArray (0 for empty elements).')
+    ends = property(getEnds, None, doc='The end values of the ARangeArray (0 for empty elements).')
+    empty = property(getEmpty, None, doc='The mask of empty elements of the ARangeArray.')
@@ -0,0 +1,33 @@
+from importlib import import_module
+
+# The available backends, as the modules implementing them. Backends are only imported when first used:
+_backends = {
+    'python': 'ranges.backends.python',
+    'numpy': 'ranges.backends.numpy'
+}
+_backend_name = 'python'
+_backend = None
+
+def available_backends():
+    """Return the names of the known backends as a list (whether or not their dependencies are installed)."""
+    return list(_backends.keys())
+
+def set_backend(name):
+    """
+    Set the backend used for batched lookups (such as RangeIndex.findMany).
+    The backend is imported immediately, so an ImportError is raised here if its dependencies are missing.
+    """
+    global _backend_name, _backend
+    if name not in _backends: raise ValueError('unknown backend "{}" (expected one of {})'.format(name, ', '.join(_backends.keys())))
+    _backend = import_module(_backends[name])
+    _backend_name = name
+
+def get_backend():
+    """Return the module implementing the current backend, importing it if required."""
+    global _backend
+    if _backend is None: _backend = import_module(_backends[_backend_name])
+    return _backend
+
+def get_backend_name():
+    """Return the name of the current backend."""
+    return _backend_name
@@ -0,0 +1,24 @@
+import numpy
+
+def _column(a):
+    """Return an array('q') of start or end values as a (zero-copy) NumPy array."""
+    if len(a) == 0: return numpy.empty(0, dtype=numpy.int64)
+    return numpy.frombuffer(a, dtype=numpy.int64)
+
+def findMany(starts, ends, values):
+    """Return the positions of the sorted, disjoint ranges (starts[i]--ends[i]) containing each of the given values as a list (with -1 for values in no range)."""
+    starts = _column(starts)
+    ends = _column(ends)
+    values = numpy.asarray(values, dtype=numpy.int64)
+    if len(starts) == 0: return [-1] * len(values)
+    i = numpy.searchsorted(starts, values, side='right') - 1
+    found = (i >= 0) & (ends[numpy.maximum(i, 0)] >= values)
+    return numpy.where(found, i, -1).tolist()
+
+def overlapSlices(starts, ends, pairs):
+    """Return the (first, last + 1) positions of the sorted, disjoint ranges (starts[i]--ends[i]) that overlap each of the given (start, end) pairs as a list."""
+    if len(pairs) == 0: return []
+    pairs = numpy.asarray(pairs, dtype=numpy.int64).reshape(-1, 2)
+    first = numpy.searchsorted(_column(ends), pairs[:, 0], side='left')
+    last = numpy.maximum(first, numpy.searchsorted(_column(starts), pairs[:, 1], side='right'))
+    return list(zip(first.tolist(), last.tolist()))
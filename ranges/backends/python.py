@@ -0,0 +1,27 @@
+from bisect import bisect_left, bisect_right
+
+def findMany(starts, ends, values):
+    """
+    Return the positions of the sorted, disjoint ranges (starts[i]--ends[i]) containing each of the given values as a list (with -1 for values in no range).
+    The values are looked up in sorted order, so each search only considers the ranges after the previous match.
+    """
+    output = [-1] * len(values)
+    lo = 0
+    for j in sorted(range(len(values)), key=values.__getitem__):
+        lo = bisect_right(starts, values[j], lo)
+        i = lo - 1
+        if (i >= 0) and (ends[i] >= values[j]): output[j] = i
+    return output
+
+def overlapSlices(starts, ends, pairs):
+    """
+    Return the (first, last + 1) positions of the sorted, disjoint ranges (starts[i]--ends[i]) that overlap each of the given (start, end) pairs as a list.
+    The pairs are looked up in order of their start values, so each search for a first position only considers the ranges after the previous one.
+    """
+    output = [None] * len(pairs)
+    lo = 0
+    for j in sorted(range(len(pairs)), key=lambda j: pairs[j][0]):
+        start, end = pairs[j]
+        lo = bisect_left(ends, start, lo)
+        output[j] = (lo, max(lo, bisect_right(starts, end, lo)))
+    return output
@@ -0,0 +1,353 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from .core import ARange, SRange, _trustedARange
+from .index import RangeIndex, _segments
+from .profiling import registerOperations
+
+# RangeBitmap objects split values into chunks of 2^16 values, each held in the smallest of three container types:
+_CHUNK_BITS = 16
+_CHUNK_SIZE = 1 << _CHUNK_BITS
+_ARRAY_MAX = 4096
+_BITMAP_BYTES = _CHUNK_SIZE // 8
+
+def _popcount(bits):
+    """Return the number of set bits in a (non-negative) integer."""
+    return bin(bits).count('1')
+
+def _bitWords(bits):
+    """Return a chunk bitset as an array of 64-bit words, lowest values first."""
+    words = array('Q')
+    words.frombytes(bits.to_bytes(_BITMAP_BYTES, sys.byteorder))
+    if sys.byteorder == 'big': words.reverse()
+    return words
+
+def _bitValues(bits):
+    """Return the values set in a chunk bitset as a sorted list."""
+    output = []
+    for i, w in enumerate(_bitWords(bits)):
+        base = i << 6
+        while w:
+            low = w & -w
+            output.append(base + low.bit_length() - 1)
+            w ^= low
+    return output
+
+def _bitRuns(bits):
+    """Return the (start, end) runs of consecutive values set in a chunk bitset as a sorted list."""
+    output = []
+    start = None
+    carry = 0
+    for i, w in enumerate(_bitWords(bits)):
+        # The set bits of t mark the positions where a run starts or where the previous run ended:
+        t = (w ^ ((w << 1) | carry)) & 0xFFFFFFFFFFFFFFFF
+        carry = w >> 63
+        base = i << 6
+        while t:
+            low = t & -t
+            position = base + low.bit_length() - 1
+            if start is None: start = position
+            else:
+                output.append((start, position - 1))
+                start = None
+            t ^= low
+    if start is not None: output.append((start, _CHUNK_SIZE - 1))
+    return output
+
+def _bitsFromRuns(runs):
+    """Return a chunk bitset with the values in the given (start, end) runs set."""
+    chars = bytearray(b'0') * _CHUNK_SIZE
+    for start, end in runs: chars[start:end + 1] = b'1' * (end - start + 1)
+    return int(bytes(chars[::-1]), 2)
+
+class _ArrayContainer(object):
+    """A chunk container holding its values as a sorted array (used for sparse chunks)."""
+    def __init__(self, values):
+        self.values = array('H', values)
+    def getCardinality(self): return len(self.values)
+    def contains(self, low):
+        i = bisect_left(self.values, low)
+        return (i < len(self.values)) and (self.values[i] == low)
+    def runs(self):
+        output = []
+        for v in self.values:
+            if output and (output[-1][1] == v - 1): output[-1][1] = v
+            else: output.append([v, v])
+        return [tuple(r) for r in output]
+    def toBits(self):
+        chars = bytearray(b'0') * _CHUNK_SIZE
+        for v in self.values: chars[v] = 49
+        return int(bytes(chars[::-1]), 2)
+    def sizeOf(self): return 2 * len(self.values)
+    cardinality = property(getCardinality)
+
+class _BitmapContainer(object):
+    """A chunk container holding its values as a bitset (used for dense chunks)."""
+    def __init__(self, bits):
+        self.bits = bits
+    def getCardinality(self): return _popcount(self.bits)
+    def contains(self, low): return (self.bits >> low) & 1 == 1
+    def runs(self): return _bitRuns(self.bits)
+    def toBits(self): return self.bits
+    def sizeOf(self): return _BITMAP_BYTES
+    cardinality = property(getCardinality)
+
+class _RunContainer(object):
+    """A chunk container holding its values as runs of consecutive values (used for chunks with few runs)."""
+    def __init__(self, runs):
+        self.starts = array('H', [r[0] for r in runs])
+        self.ends = array('H', [r[1] for r in runs])
+    def getCardinality(self): return sum(self.ends) - sum(self.starts) + len(self.starts)
+    def contains(self, low):
+        i = bisect_right(self.starts, low) - 1
+        return (i >= 0) and (self.ends[i] >= low)
+    def runs(self): return list(zip(self.starts, self.ends))
+    def toBits(self): return _bitsFromRuns(self.runs())
+    def sizeOf(self): return 4 * len(self.starts)
+    cardinality = property(getCardinality)
+
+def _containerFromBits(bits):
+    """Return the smallest container holding the values set in a chunk bitset, or None if no values are set."""
+    cardinality = _popcount(bits)
+    if cardinality == 0: return None
+    n_runs = _popcount(bits & ~(bits << 1))
+    if (4 * n_runs <= min(2 * cardinality, _BITMAP_BYTES)): return _RunContainer(_bitRuns(bits))
+    if cardinality <= _ARRAY_MAX: return _ArrayContainer(_bitValues(bits))
+    return _BitmapContainer(bits)
+
+def _containerFromRuns(runs):
+    """Return the smallest container holding the values in a sorted list of disjoint, non-adjacent (start, end) runs."""
+    if len(runs) == 0: return None
+    cardinality = sum(end - start + 1 for start, end in runs)
+    if (4 * len(runs) <= min(2 * cardinality, _BITMAP_BYTES)): return _RunContainer(runs)
+    if cardinality <= _ARRAY_MAX: return _ArrayContainer([v for start, end in runs for v in range(start, end + 1)])
+    return _BitmapContainer(_bitsFromRuns(runs))
+
+def _containerOperation(op, a, b):
+    """Return the result of the binary operation op ('and', 'or', 'sub' or 'xor') on two containers (either of which may be None)."""
+    if a is None:
+        if op in ('and', 'sub'): return None
+        return b
+    if b is None:
+        if op == 'and': return None
+        return a
+    if isinstance(a, _ArrayContainer) and isinstance(b, _ArrayContainer):
+        if op == 'and': values = set(a.values).intersection(b.values)
+        elif op == 'sub': values = set(a.values).difference(b.values)
+        elif op == 'or': values = set(a.values).union(b.values)
+        else: values = set(a.values).symmetric_difference(b.values)
+        if len(values) == 0: return None
+        if len(values) <= _ARRAY_MAX: return _ArrayContainer(sorted(values))
+    if op == 'and': return _containerFromBits(a.toBits() & b.toBits())
+    if op == 'sub': return _containerFromBits(a.toBits() & ~b.toBits())
+    if op == 'or': return _containerFromBits(a.toBits() | b.toBits())
+    return _containerFromBits(a.toBits() ^ b.toBits())
+
+class RangeBitmap(object):
+    """
+    The RangeBitmap class represents a set of positive integers as a compressed bitmap.
+    Values are split into chunks of 65536 consecutive values, and each chunk is held in the smallest of three containers:
+    a sorted array for sparse chunks, a bitset for dense chunks, or a list of runs for chunks with few runs of consecutive values.
+    Set operations are made chunk by chunk, and the container type is chosen again for each result.
+    RangeBitmap objects are much smaller and faster than the equivalent SRange for highly fragmented sets (such as many single values).
+    SRange does not switch to a RangeBitmap by itself: convert with RangeBitmap(r) where a set is known to be fragmented, and back with toSRange().
+    """
+    @classmethod
+    def fromSet(cls, l):
+        """Initialize a RangeBitmap object from the values contained in the given set."""
+        chunks = {}
+        for i in l:
+            i = int(i)
+            if i <= 0: raise ValueError('RangeBitmap values must be positive')
+            chunks.setdefault(i >> _CHUNK_BITS, set()).add(i & (_CHUNK_SIZE - 1))
+        output = cls()
+        for key in sorted(chunks.keys()):
+            runs = []
+            for v in sorted(chunks[key]):
+                if runs and (runs[-1][1] == v - 1): runs[-1] = (runs[-1][0], v)
+                else: runs.append((v, v))
+            output._set(key, _containerFromRuns(runs))
+        return output
+
+    def __init__(self, r=None):
+        """Initialize a RangeBitmap object from the given (S|A)Range or RangeIndex. If r is None, then an empty RangeBitmap is returned."""
+        super().__init__()
+        self._keys = []
+        self._containers = {}
+        if r is None: return
+        if isinstance(r, RangeBitmap):
+            self._keys = list(r._keys)
+            self._containers = dict(r._containers)
+            return
+        chunks = {}
+        for start, end in _segments(r):
+            while start <= end:
+                key = start >> _CHUNK_BITS
+                chunk_end = min(end, ((key + 1) << _CHUNK_BITS) - 1)
+                runs = chunks.setdefault(key, [])
+                low = (start & (_CHUNK_SIZE - 1), chunk_end & (_CHUNK_SIZE - 1))
+                if runs and (runs[-1][1] == low[0] - 1): runs[-1] = (runs[-1][0], low[1])
+                else: runs.append(low)
+                start = chunk_end + 1
+        for key in sorted(chunks.keys()): self._set(key, _containerFromRuns(chunks[key]))
+
+    def _set(self, key, container):
+        """Set (or remove, if container is None) the container for a chunk. Keys must be set in increasing order."""
+        if container is None: return
+        self._keys.append(key)
+        self._containers[key] = container
+
+    def copy(self):
+        """Return a copy of the RangeBitmap object. As containers are never changed, they are shared with the copy."""
+        return RangeBitmap(self)
+
+    def isEmpty(self):
+        """Test if the RangeBitmap object is empty."""
+        return len(self._keys) == 0
+
+    def isDisjoint(self):
+        """Test if the RangeBitmap object is disjoint (i.e. can not be described as a single atomic range)."""
+        return len(self.ranges) > 1
+
+    def _runs(self):
+        """Return the consolidated (start, end) runs of the values in the RangeBitmap."""
+        output = []
+        for key in self._keys:
+            offset = key << _CHUNK_BITS
+            runs = self._containers[key].runs()
+            if offset > 0: runs = [(start + offset, end + offset) for start, end in runs]
+            # Only the first run of a chunk can continue the last run of the previous chunk:
+            if output and (output[-1][1] == runs[0][0] - 1):
+                output[-1] = (output[-1][0], runs[0][1])
+                runs = runs[1:]
+            output.extend(runs)
+        return output
+
+    def getSegments(self):
+        """Return the number of atomic ranges in the RangeBitmap."""
+        return len(self._runs())
+
+    def getRanges(self):
+        """Return the values in the RangeBitmap as a list of ARange objects."""
+        return [_trustedARange(start, end) for start, end in self._runs()]
+
+    def getSpan(self):
+        """Return the span of the RangeBitmap object."""
+        if self.empty: return ARange()
+        first = self._containers[self._keys[0]].runs()[0][0]
+        last = self._containers[self._keys[-1]].runs()[-1][1]
+        return ARange((self._keys[0] << _CHUNK_BITS) + first, (self._keys[-1] << _CHUNK_BITS) + last)
+
+    def getContainerTypes(self):
+        """Return the number of chunks held in each container type as a dictionary."""
+        output = {'array': 0, 'bitmap': 0, 'run': 0}
+        for c in self._containers.values():
+            if isinstance(c, _ArrayContainer): output['array'] += 1
+            elif isinstance(c, _BitmapContainer): output['bitmap'] += 1
+            else: output['run'] += 1
+        return output
+
+    def sizeOf(self):
+        """Return the approximate number of bytes used to hold the values (excluding fixed per-object overheads)."""
+        return sum(c.sizeOf() for c in self._containers.values())
+
+    def toSRange(self):
+        """Return the values in the RangeBitmap as a new SRange object."""
+        return SRange(self.ranges)
+
+    def asList(self):
+        """Return all integer values covered by the RangeBitmap object as a list."""
+        output = []
+        for start, end in self._runs(): output.extend(range(start, end + 1))
+        return output
+
+    def asSet(self):
+        """Return all integer values covered by the RangeBitmap object as a set."""
+        return set(self.asList())
+
+    def _operation(self, op, other):
+        """Return the result of a binary operation between self and another (S|A)Range or RangeBitmap object."""
+        if not isinstance(other, RangeBitmap):
+            if isinstance(other, ARange) or isinstance(other, SRange) or isinstance(other, RangeIndex): other = RangeBitmap(other)
+            else: return NotImplemented
+        if op == 'and': keys = sorted(set(self._keys).intersection(other._keys))
+        elif op == 'sub': keys = self._keys
+        else: keys = sorted(set(self._keys).union(other._keys))
+        output = RangeBitmap()
+        for key in keys: output._set(key, _containerOperation(op, self._containers.get(key), other._containers.get(key)))
+        return output
+
+    def __and__(self, other):
+        """Return the intersection of self with another (S|A)Range or RangeBitmap object."""
+        return self._operation('and', other)
+
+    def __or__(self, other):
+        """Return the union of self with another (S|A)Range or RangeBitmap object."""
+        return self._operation('or', other)
+
+    def __sub__(self, other):
+        """Return the difference of self with another (S|A)Range or RangeBitmap object."""
+        return self._operation('sub', other)
+
+    def __xor__(self, other):
+        """Return the exclusive disjunction between self and another (S|A)Range or RangeBitmap object."""
+        return self._operation('xor', other)
+
+    def __rand__(self, other):
+        """Return the intersection of another (S|A)Range object with self."""
+        return self.__and__(other)
+
+    def __ror__(self, other):
+        """Return the union of another (S|A)Range object with self."""
+        return self.__or__(other)
+
+    def __rxor__(self, other):
+        """Return the exclusive disjunction between another (S|A)Range object and self."""
+        return self.__xor__(other)
+
+    def __rsub__(self, other):
+        """Return the difference of another (S|A)Range object with self."""
+        if isinstance(other, ARange) or isinstance(other, SRange): return RangeBitmap(other)._operation('sub', self)
+        return NotImplemented
+
+    def __contains__(self, value):
+        """Test if value is contained in the RangeBitmap."""
+        container = self._containers.get(value >> _CHUNK_BITS)
+        return (container is not None) and container.contains(value & (_CHUNK_SIZE - 1))
+
+    def __eq__(self, other):
+        """Test two ranges for equality."""
+        if isinstance(other, RangeBitmap): return self._runs() == other._runs()
+        if isinstance(other, ARange) or isinstance(other, SRange): return self._runs() == [(r.start, r.end) for r in other.ranges if r.empty is False]
+        return NotImplemented
+
+    def __ne__(self, other):
+        """Test two ranges for inequality."""
+        result = self.__eq__(other)
+        if result is NotImplemented: return result
+        return not result
+
+    def __bool__(self):
+        """Test if a RangeBitmap is not empty."""
+        return not self.empty
+
+    def __len__(self):
+        """Return the length of a RangeBitmap (i.e. the number of values it contains)."""
+        return sum(c.cardinality for c in self._containers.values())
+
+    def __str__(self):
+        """Return a string representation of a RangeBitmap."""
+        return str(self.toSRange())
+
+    def __repr__(self):
+        """Show the code that would regenerate the RangeBitmap."""
+        return 'RangeBitmap({})'.format(repr(self.toSRange()))
+
+    empty = property(isEmpty, None, doc='Is the RangeBitmap empty?')
+    disjoint = property(isDisjoint, None, doc='Is the RangeBitmap disjoint?')
+    segments = property(getSegments, None, doc='The number of atomic ranges in the RangeBitmap.')
+    ranges = property(getRanges, None, doc='The ranges of the RangeBitmap as a list.')
+    span = property(getSpan, None, doc='The complete span of the RangeBitmap.')
+    containerTypes = property(getContainerTypes, None, doc='The number of chunks held in each container type.')
+
+registerOperations(RangeBitmap, ['fromSet', '__and__', '__or__', '__sub__', '__xor__'])
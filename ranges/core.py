@@ -258,6 +258,13 @@ class ARange(object):
     span = property(getSpan, None, doc='The span of the ARange.')
     ranges = property(getRanges, None, doc='The ranges of the ARange as a list.')
 
+def _trustedARange(start, end):
+    """Return a new ARange from start and end values that are already known to be valid (i.e. positive, with start <= end)."""
+    output = ARange.__new__(ARange)
+    output._start = start
+    output._end = end
+    return output
+
 class SRange(object):
     """
     The SRange class represents a set of possible non-consecutive positive integer values.
@@ -274,6 +281,7 @@ class SRange(object):
     def __init__(self, ranges=[]):
         """Initialize an SRange object from the given list of ARange objects. If the ranges list is empty, then an empty SRange is returned."""
         super().__init__()
+        self._version = 0
         self.ranges = ranges
         
     def setRanges(self, ranges):
@@ -299,6 +307,7 @@ class SRange(object):
         
     def consolidate(self):
         """Consolidate the list of atomic ranges by merging those that overlap."""
+        self._version += 1
         self.sort()
         i = 0
         while True:
@@ -309,6 +318,10 @@ class SRange(object):
                 self._ranges.pop(j)
             else: i += 1
         
+    def getVersion(self):
+        """Return a counter that is increased whenever the SRange is changed through its methods."""
+        return self._version
+
     def isEmpty(self):
         """Test if the SRange object is empty."""
         return len(self) == 0
@@ -542,3 +555,4 @@ class SRange(object):
     empty = property(isEmpty, None, doc='Is the SRange empty?')
     disjoint = property(isDisjoint, None, doc='Is the SRange disjoint?')
     span = property(getSpan, None, doc='The complete span of the SRange.')
+    version = property(getVersion, None, doc='The change counter of the SRange.')
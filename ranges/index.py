@@ -0,0 +1,337 @@
+import hashlib
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from .backends import get_backend
+from .core import ARange, SRange, _trustedARange
+
+def _segments(x):
+    """Return the (start, end) pairs of the atomic ranges in an (S|A)Range or RangeIndex object."""
+    if isinstance(x, RangeIndex): return zip(x._starts, x._ends)
+    return [(r.start, r.end) for r in x.ranges if r.empty is False]
+
+def fingerprint(x):
+    """
+    Return a hashable fingerprint of the values in an (S|A)Range or RangeIndex object.
+    The fingerprint is a fixed-size digest, so objects containing the same values always share a fingerprint and (barring a digest collision) objects containing different values do not.
+    """
+    if isinstance(x, RangeIndex): return x.fingerprint
+    if isinstance(x, SRange) or isinstance(x, ARange): return RangeIndex(x).fingerprint
+    raise TypeError('can not fingerprint an object of type {}'.format(type(x).__name__))
+
+class RangeIndex(object):
+    """
+    The RangeIndex class is an immutable, array-backed copy of the atomic ranges in an (S|A)Range.
+    The start and end values are held in sorted arrays so that lookups are made by binary search rather than by scanning.
+    As RangeIndex objects can not be changed, they can be safely shared and used as cache keys.
+    """
+    def __init__(self, r=None):
+        """Initialize a RangeIndex object from the given (S|A)Range. If r is None, then an empty RangeIndex is returned."""
+        super().__init__()
+        self._starts = array('q')
+        self._ends = array('q')
+        self._fingerprint = None
+        if r is None: return
+        for start, end in _segments(r):
+            self._starts.append(start)
+            self._ends.append(end)
+
+    def getSegments(self):
+        """Return the number of atomic ranges in the index."""
+        return len(self._starts)
+
+    def getFingerprint(self):
+        """Return a hashable fingerprint (a fixed-size digest) of the values in the index."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(self._starts.tobytes())
+            digest.update(self._ends.tobytes())
+            self._fingerprint = digest.digest()
+        return self._fingerprint
+
+    def getStartsView(self):
+        """Return a read-only memoryview (of signed 64-bit integers) of the start values, without copying them."""
+        return memoryview(self._starts).toreadonly()
+
+    def getEndsView(self):
+        """Return a read-only memoryview (of signed 64-bit integers) of the end values, without copying them."""
+        return memoryview(self._ends).toreadonly()
+
+    def publish(self, name=None):
+        """Copy the index into a new shared memory block, returning the owning SharedRangeIndex (see ranges.shared)."""
+        from .shared import SharedRangeIndex
+        return SharedRangeIndex.create(self, name)
+
+    def isEmpty(self):
+        """Test if the RangeIndex object is empty."""
+        return len(self._starts) == 0
+
+    def getRanges(self):
+        """Return the ARange objects contained in the index as a list."""
+        return [_trustedARange(start, end) for start, end in zip(self._starts, self._ends)]
+
+    def getSpan(self):
+        """Return the span of the RangeIndex object."""
+        if self.empty: return ARange()
+        return ARange(self._starts[0], self._ends[-1])
+
+    def toSRange(self):
+        """Return the values in the index as a new SRange object."""
+        return SRange(self.getRanges())
+
+    def find(self, value):
+        """Return the position of the atomic range containing value, or -1 if no range contains it."""
+        i = bisect_right(self._starts, value) - 1
+        if (i >= 0) and (self._ends[i] >= value): return i
+        return -1
+
+    def contains(self, value):
+        """Test if value is contained in the index."""
+        return self.find(value) >= 0
+
+    def findMany(self, values):
+        """
+        Return the positions of the atomic ranges containing each of the given values as a list (with -1 for values not in the index).
+        The lookup is made by the current backend (see set_backend).
+        """
+        return get_backend().findMany(self._starts, self._ends, values)
+
+    def overlapSlice(self, start, end):
+        """Return the (first, last + 1) positions of the atomic ranges that overlap the values start--end."""
+        return (bisect_left(self._ends, start), bisect_right(self._starts, end))
+
+    def overlapSlices(self, pairs):
+        """
+        Return the (first, last + 1) positions of the atomic ranges that overlap each of the given (start, end) pairs as a list.
+        The lookup is made by the current backend (see set_backend).
+        """
+        return get_backend().overlapSlices(self._starts, self._ends, pairs)
+
+    def overlapping(self, other):
+        """Return the atomic ranges in the index that overlap an (S|A)Range as a list of ARange objects."""
+        output = []
+        last = -1
+        for start, end in _segments(other):
+            i0, i1 = self.overlapSlice(start, end)
+            for i in range(max(i0, last + 1), i1):
+                output.append(ARange(self._starts[i], self._ends[i]))
+                last = i
+        return output
+
+    def overlaps(self, other):
+        """Test if the index overlaps an (S|A)Range."""
+        for start, end in _segments(other):
+            i0, i1 = self.overlapSlice(start, end)
+            if i1 > i0: return True
+        return False
+
+    def intersect(self, other):
+        """Return the intersection of the index with an (S|A)Range as a new SRange object."""
+        output = []
+        for start, end in _segments(other):
+            i0, i1 = self.overlapSlice(start, end)
+            for i in range(i0, i1): output.append(ARange(max(start, self._starts[i]), min(end, self._ends[i])))
+        return SRange(output)
+
+    def subtractFrom(self, other):
+        """Return an (S|A)Range with the values in the index removed as a new SRange object."""
+        output = []
+        for start, end in _segments(other):
+            i0, i1 = self.overlapSlice(start, end)
+            current = start
+            for i in range(i0, i1):
+                if self._starts[i] > current: output.append(ARange(current, self._starts[i] - 1))
+                current = self._ends[i] + 1
+            if current <= end: output.append(ARange(current, end))
+        return SRange(output)
+
+    def __eq__(self, other):
+        """Test two indexes for equality."""
+        return isinstance(other, RangeIndex) and (self._starts == other._starts) and (self._ends == other._ends)
+
+    def __ne__(self, other):
+        """Test two indexes for inequality."""
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        """Return a hash of the values in the index."""
+        return hash(self.fingerprint)
+
+    def __len__(self):
+        """Return the length of the index (i.e. the number of values it contains)."""
+        return sum(self._ends) - sum(self._starts) + len(self._starts)
+
+    def __bool__(self):
+        """Test if a RangeIndex is not empty."""
+        return not self.empty
+
+    def __str__(self):
+        """Return a string representation of a RangeIndex."""
+        return str(self.toSRange())
+
+    def __repr__(self):
+        """Show the code that would regenerate the RangeIndex."""
+        return 'RangeIndex({})'.format(repr(self.toSRange()))
+
+    segments = property(getSegments, None, doc='The number of atomic ranges in the RangeIndex.')
+    startsView = property(getStartsView, None, doc='A read-only memoryview of the start values of the RangeIndex.')
+    endsView = property(getEndsView, None, doc='A read-only memoryview of the end values of the RangeIndex.')
+    fingerprint = property(getFingerprint, None, doc='A hashable fingerprint of the values in the RangeIndex.')
+    empty = property(isEmpty, None, doc='Is the RangeIndex empty?')
+    ranges = property(getRanges, None, doc='The ranges of the RangeIndex as a list.')
+    span = property(getSpan, None, doc='The complete span of the RangeIndex.')
+
+def _applyOperation(op, a, b):
+    """Return the result of the binary operation op ('and', 'or', 'sub' or 'xor') on two RangeIndex objects as a new SRange."""
+    if op == 'and': return b.intersect(a)
+    if op == 'sub': return b.subtractFrom(a)
+    union = SRange(a.ranges + b.ranges)
+    if op == 'or': return union
+    if op == 'xor': return RangeIndex(b.intersect(a)).subtractFrom(union)
+    raise ValueError('unknown operation "{}"'.format(op))
+
+class RangeCache(object):
+    """
+    The RangeCache class memoises the results of binary range operations.
+    Results are keyed by the operation and the fingerprints of its operands, so a changed operand never returns a stale result.
+    SRange operands are tracked by identity and version, so repeated queries against an unchanged SRange do not rehash it.
+    SRanges changed without using their methods (e.g. by editing the list returned by ranges) must be passed to invalidate().
+    The cache also holds a RangeIndex for each operand, which is reused by later operations on the same values.
+    The cache size is bounded by the total number of atomic ranges stored, with the least recently used entries evicted first.
+    """
+    operations = ('and', 'or', 'sub', 'xor')
+
+    def __init__(self, max_segments=1000000):
+        """Initialize an empty RangeCache holding at most max_segments atomic ranges."""
+        super().__init__()
+        if max_segments < 0: raise ValueError('max_segments must not be negative')
+        self._max_segments = max_segments
+        self._entries = OrderedDict()
+        self._tracked = {}
+        self.clear()
+
+    def clear(self):
+        """Remove all entries from the cache and reset the statistics."""
+        self._entries.clear()
+        self._tracked.clear()
+        self._segments = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _resolve(self, x):
+        """
+        Return the fingerprint of x and, if one had to be built, a RangeIndex of x (otherwise None).
+        SRange objects are tracked by identity, so an unchanged SRange (with the same version) is not fingerprinted again.
+        Entries for a previous state of a tracked SRange are dropped when it is seen again with a new version.
+        """
+        if isinstance(x, RangeIndex): return (x.fingerprint, x)
+        if not isinstance(x, SRange):
+            index = RangeIndex(x)
+            return (fingerprint(index), index)
+        tracked = self._tracked.get(id(x))
+        if (tracked is not None) and (tracked[0]() is x):
+            if tracked[1] == x.version: return (tracked[2], None)
+            self._invalidateFingerprint(tracked[2])
+        else: self._tracked = {k: v for k, v in self._tracked.items() if v[0]() is not None}
+        index = RangeIndex(x)
+        self._tracked[id(x)] = (weakref.ref(x), x.version, index.fingerprint)
+        return (index.fingerprint, index)
+
+    def _index(self, x, fp, index):
+        """Return a RangeIndex of x (with fingerprint fp), reusing a cached or newly built index where possible."""
+        key = ('index', fp)
+        entry = self._lookup(key)
+        if entry is not None: return entry
+        if index is None: index = RangeIndex(x)
+        self._store(key, index)
+        return index
+
+    def _lookup(self, key):
+        """Return the cached entry for key (marking it as recently used), or None if there is no entry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, entry):
+        """Store an entry in the cache, evicting the least recently used entries as required. Every entry costs at least one segment."""
+        size = max(1, entry.segments)
+        if size > self._max_segments: return
+        self._entries[key] = entry
+        self._segments += size
+        while self._segments > self._max_segments:
+            old_key, old = self._entries.popitem(last=False)
+            self._segments -= max(1, old.segments)
+            self._evictions += 1
+
+    def _invalidateFingerprint(self, fp):
+        """Remove all entries that depend on the given fingerprint."""
+        for key in [k for k in self._entries if fp in k[1:]]:
+            self._segments -= max(1, self._entries.pop(key).segments)
+
+    def index(self, r):
+        """Return a (possibly cached) RangeIndex of the values in an (S|A)Range."""
+        if isinstance(r, RangeIndex): return r
+        fp, index = self._resolve(r)
+        return self._index(r, fp, index)
+
+    def apply(self, op, a, b):
+        """
+        Return the result of a binary operation on two (S|A)Range objects as a new SRange.
+        The operation is one of 'and', 'or', 'sub' or 'xor'.
+        """
+        if op not in self.operations: raise ValueError('unknown operation "{}"'.format(op))
+        fp_a, index_a = self._resolve(a)
+        fp_b, index_b = self._resolve(b)
+        key = (op, fp_a, fp_b)
+        entry = self._lookup(key)
+        if entry is None:
+            entry = RangeIndex(_applyOperation(op, self._index(a, fp_a, index_a), self._index(b, fp_b, index_b)))
+            self._store(key, entry)
+        return entry.toSRange()
+
+    def intersection(self, a, b):
+        """Return the (possibly cached) intersection of two (S|A)Range objects."""
+        return self.apply('and', a, b)
+
+    def union(self, a, b):
+        """Return the (possibly cached) union of two (S|A)Range objects."""
+        return self.apply('or', a, b)
+
+    def difference(self, a, b):
+        """Return the (possibly cached) difference of two (S|A)Range objects."""
+        return self.apply('sub', a, b)
+
+    def symmetricDifference(self, a, b):
+        """Return the (possibly cached) exclusive disjunction of two (S|A)Range objects."""
+        return self.apply('xor', a, b)
+
+    def invalidate(self, r=None):
+        """Remove all entries that depend on the values in an (S|A)Range. If r is None, then all entries are removed."""
+        if r is None:
+            self._entries.clear()
+            self._tracked.clear()
+            self._segments = 0
+        else: self._invalidateFingerprint(fingerprint(r))
+
+    def getStats(self):
+        """Return the cache statistics as a dictionary. Hits and misses include lookups of cached indexes."""
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'entries': len(self._entries),
+            'segments': self._segments,
+            'max_segments': self._max_segments
+        }
+
+    def __len__(self):
+        """Return the number of entries in the cache."""
+        return len(self._entries)
+
+    stats = property(getStats, None, doc='The hit, miss and eviction statistics of the RangeCache.')
@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from .core import ARange, SRange
+
+def _segmentCount(x):
+    """Return the number of atomic ranges in x (or its length for other sized objects)."""
+    if isinstance(x, ARange): return 0 if x.empty else 1
+    if isinstance(x, SRange): return len(x._ranges)
+    segments = getattr(x, 'segments', None)
+    if isinstance(segments, int): return segments
+    try: return len(x)
+    except TypeError: return 0
+
+class Profile(object):
+    """
+    The Profile class collects statistics for the range operations called whilst it is active.
+    For each operation, the number of calls, the total wall time (in seconds) and the total number of input and output segments are recorded.
+    Times are inclusive, so operations called by other operations are counted in both.
+    """
+    def __init__(self):
+        """Initialize an empty Profile object."""
+        super().__init__()
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded statistics."""
+        self._stats = {}
+
+    def record(self, name, elapsed, segments_in, segments_out):
+        """Record a single call to the named operation."""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = {'calls': 0, 'time': 0.0, 'segments_in': 0, 'segments_out': 0}
+            self._stats[name] = stats
+        stats['calls'] += 1
+        stats['time'] += elapsed
+        stats['segments_in'] += segments_in
+        stats['segments_out'] += segments_out
+
+    def asDict(self):
+        """Return the recorded statistics as a dictionary keyed by operation name."""
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def asJSON(self, **kwargs):
+        """Return the recorded statistics as a JSON string. Keyword arguments are passed to json.dumps."""
+        return json.dumps(self.asDict(), **kwargs)
+
+    def __getitem__(self, name):
+        """Return the statistics recorded for a single operation."""
+        return dict(self._stats[name])
+
+    def __contains__(self, name):
+        """Test if any calls to the named operation have been recorded."""
+        return name in self._stats
+
+    def __str__(self):
+        """Return a tabular summary of the recorded statistics."""
+        lines = ['{:<24} {:>8} {:>12} {:>12} {:>12}'.format('operation', 'calls', 'time', 'segs in', 'segs out')]
+        for name, s in sorted(self._stats.items(), key=lambda x: -x[1]['time']):
+            lines.append('{:<24} {:>8} {:>12.6f} {:>12} {:>12}'.format(name, s['calls'], s['time'], s['segments_in'], s['segments_out']))
+        return '\n'.join(lines)
+
+    stats = property(asDict, None, doc='The recorded statistics as a dictionary.')
+
+# The operations instrumented by profile(), as (class, attribute name) pairs:
+_profiled_operations = [
+    (ARange, '__and__'), (ARange, '__or__'), (ARange, '__sub__'), (ARange, '__xor__'),
+    (SRange, 'fromSet'), (SRange, 'consolidate'), (SRange, 'translate'), (SRange, 'expand'), (SRange, 'split'),
+    (SRange, 'insert'), (SRange, 'insertAtomic'), (SRange, 'remove'), (SRange, 'removeAtomic'),
+    (SRange, '__and__'), (SRange, '__or__'), (SRange, '__sub__'), (SRange, '__xor__'),
+]
+_active_profiles = []
+_original_operations = {}
+_installed = False
+_profile_lock = threading.Lock()
+
+def _instrument(name, fun):
+    """Return a wrapper around fun that records each call in the active Profile objects."""
+    def wrapper(*args, **kwargs):
+        segments_in = sum(_segmentCount(a) for a in args[1:])
+        if not isinstance(args[0], type): segments_in += _segmentCount(args[0])
+        start = time.perf_counter()
+        result = fun(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        output = args[0] if result is None else result
+        if isinstance(output, tuple): segments_out = sum(_segmentCount(o) for o in output)
+        else: segments_out = _segmentCount(output)
+        for p in tuple(_active_profiles): p.record(name, elapsed, segments_in, segments_out)
+        return result
+    wrapper.__name__ = fun.__name__
+    wrapper.__doc__ = fun.__doc__
+    wrapper.__wrapped__ = fun
+    return wrapper
+
+def _instrumentOperation(cls, attr):
+    """Replace a single operation with its instrumented version. This must be called with _profile_lock held."""
+    original = cls.__dict__[attr]
+    _original_operations[(cls, attr)] = original
+    name = '{}.{}'.format(cls.__name__, attr)
+    if isinstance(original, classmethod): setattr(cls, attr, classmethod(_instrument(name, original.__func__)))
+    else: setattr(cls, attr, _instrument(name, original))
+
+def _installInstrumentation():
+    """Replace the profiled operations with their instrumented versions. This must be called with _profile_lock held."""
+    global _installed
+    if _installed is True: return
+    for cls, attr in _profiled_operations: _instrumentOperation(cls, attr)
+    _installed = True
+
+def _removeInstrumentation():
+    """Restore the original (uninstrumented) operations. This must be called with _profile_lock held."""
+    global _installed
+    for (cls, attr), original in _original_operations.items(): setattr(cls, attr, original)
+    _original_operations.clear()
+    _installed = False
+
+def registerOperations(cls, attrs):
+    """
+    Add the named operations of a class to those instrumented by profile().
+    This is used by the submodules that are imported when first used, so their classes are instrumented even if loaded whilst a profile is active.
+    """
+    with _profile_lock:
+        for attr in attrs:
+            _profiled_operations.append((cls, attr))
+            if _installed is True: _instrumentOperation(cls, attr)
+
+@contextmanager
+def profile(p=None):
+    """
+    Collect statistics for all range operations called within a with block, yielding the Profile object used.
+    The instrumentation is only installed whilst at least one profile is active, so there is no overhead otherwise.
+    Profiles may be nested, in which case each active Profile records every call.
+    Instrumentation is process-wide, so calls made by other threads whilst a profile is active are also recorded.
+    """
+    if p is None: p = Profile()
+    with _profile_lock:
+        _installInstrumentation()
+        _active_profiles.append(p)
+    try: yield p
+    finally:
+        with _profile_lock:
+            _active_profiles.remove(p)
+            if len(_active_profiles) == 0: _removeInstrumentation()
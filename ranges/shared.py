@@ -0,0 +1,107 @@
+import sys
+from multiprocessing import shared_memory
+from .index import RangeIndex
+
+# The shared memory block holds the number of ranges followed by the start and end values, all as signed 64-bit integers:
+_ITEM_SIZE = 8
+
+class SharedRangeIndex(RangeIndex):
+    """
+    The SharedRangeIndex class is a RangeIndex whose start and end values are held in a multiprocessing.shared_memory block.
+    A SharedRangeIndex is created in one process by create() (or RangeIndex.publish()), and attached to (read-only, without copying) by name in others with attach().
+    Pickling a SharedRangeIndex only pickles the block name, so passing one to a worker process attaches to the block rather than copying it.
+    The publishing process owns the block and should unlink() it once no longer needed; every process should close() its SharedRangeIndex.
+    """
+    @classmethod
+    def create(cls, r, name=None):
+        """Copy an (S|A)Range or RangeIndex into a new shared memory block (optionally with the given name), returning the owning SharedRangeIndex."""
+        if not isinstance(r, RangeIndex): r = RangeIndex(r)
+        n = r.segments
+        shm = shared_memory.SharedMemory(name=name, create=True, size=_ITEM_SIZE * (1 + 2 * n))
+        try:
+            values = shm.buf.cast('q')
+            values[0] = n
+            values[1:n + 1] = r.startsView
+            values[n + 1:] = r.endsView
+            values.release()
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Attach (read-only) to a SharedRangeIndex published by another process."""
+        shm = shared_memory.SharedMemory(name=name)
+        # Before Python 3.13, attaching registers the block with this process's resource tracker, which would unlink it on exit:
+        if sys.version_info < (3, 13):
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            except Exception: pass
+        return cls(shm, owner=False)
+
+    def __init__(self, shm, owner=False):
+        """Initialize a SharedRangeIndex object from an open SharedMemory block. Use create() or attach() rather than calling this directly."""
+        super().__init__()
+        self._shm = shm
+        self._owner = owner
+        self._buffer = shm.buf.toreadonly()
+        n = self._buffer[:_ITEM_SIZE].cast('q')[0]
+        self._starts = self._buffer[_ITEM_SIZE:_ITEM_SIZE * (1 + n)].cast('q')
+        self._ends = self._buffer[_ITEM_SIZE * (1 + n):_ITEM_SIZE * (1 + 2 * n)].cast('q')
+
+    def getName(self):
+        """Return the name of the shared memory block."""
+        return self._shm.name
+
+    def isOwner(self):
+        """Test if this SharedRangeIndex published (and so owns) the shared memory block."""
+        return self._owner
+
+    def getStartsView(self):
+        """Return a read-only memoryview (of signed 64-bit integers) of the start values in shared memory."""
+        return self._starts
+
+    def getEndsView(self):
+        """Return a read-only memoryview (of signed 64-bit integers) of the end values in shared memory."""
+        return self._ends
+
+    def close(self):
+        """Release the views of the shared memory block and close it in this process. The SharedRangeIndex can not be used afterwards."""
+        if self._shm is None: return
+        self._starts.release()
+        self._ends.release()
+        self._buffer.release()
+        self._starts = self._ends = self._buffer = None
+        self._shm.close()
+
+    def unlink(self):
+        """Close the shared memory block and (if this SharedRangeIndex owns it) remove it, so that it is freed once every process has closed it."""
+        shm = self._shm
+        self.close()
+        if self._owner and (shm is not None): shm.unlink()
+        self._shm = None
+
+    def __reduce__(self):
+        """Pickle the SharedRangeIndex as its block name, so that unpickling attaches to the block."""
+        return (SharedRangeIndex.attach, (self.name,))
+
+    def __enter__(self):
+        """Enter a with block, returning the SharedRangeIndex."""
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Unlink (if owned) or close the shared memory block on leaving a with block."""
+        if self._owner: self.unlink()
+        else: self.close()
+
+    def __repr__(self):
+        """Show the code that would attach to the SharedRangeIndex."""
+        return 'SharedRangeIndex.attach({!r})'.format(self.name)
+
+    name = property(getName, None, doc='The name of the shared memory block.')
+    owner = property(isOwner, None, doc='Does this SharedRangeIndex own the shared memory block?')
+    startsView = property(getStartsView, None, doc='A read-only memoryview of the start values in shared memory.')
+    endsView = property(getEndsView, None, doc='A read-only memoryview of the end values in shared memory.')
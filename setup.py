@@ -17,8 +17,12 @@ setup(
         'License :: OSI Approved :: GNU Lesser General Public License v3 (LGPLv3)',
         'Programming Language :: Python :: 3'
     ],
-    py_modules = ['ranges', 'version'],
+    packages = ['ranges', 'ranges.backends'],
+    py_modules = ['version'],
     install_requires = [
     ],
-    python_requires = '>=3',
+    extras_require = {
+        'numpy': ['numpy'],
+    },
+    python_requires = '>=3.8',
 )
@@ -0,0 +1,97 @@
+import pytest
+import sys
+from random import randrange
+sys.path.append('../')
+from ranges import ARange
+numpy = pytest.importorskip('numpy')
+from ranges import ARangeArray
+
+max_len = 50
+n_ranges = 500
+
+def randomARange(max_len):
+    if randrange(0, 10) == 0: return ARange()
+    return ARange(randrange(1, max_len + 1), randrange(1, max_len + 1))
+
+def pytest_generate_tests(metafunc):
+    if 'a' not in metafunc.fixturenames: return
+    a = [randomARange(max_len) for i in range(n_ranges)]
+    b = [randomARange(max_len) for i in range(n_ranges)]
+    metafunc.parametrize("a,b", [(a, b), (a, [randomARange(max_len)] * n_ranges)])
+
+def other(b):
+    # Use a broadcast ARange when all of b is the same ARange:
+    if all(r is b[0] for r in b): return b[0]
+    return ARangeArray.fromList(b)
+
+def test_conversion(a, b):
+    arr = ARangeArray.fromList(a)
+    assert arr.toList() == a
+    assert len(arr) == len(a)
+    assert list(arr.lengths()) == [len(r) for r in a]
+    assert arr[3] == a[3]
+    assert arr[2:5].toList() == a[2:5]
+
+def test_constructor():
+    arr = ARangeArray([5, 1, 3], [2, 1, 9], empty=[False, False, True])
+    assert arr.toList() == [ARange(2, 5), ARange(1), ARange()]
+    with pytest.raises(ValueError): ARangeArray([0, 1])
+    with pytest.raises(ValueError): ARangeArray([1, 2], [3])
+
+def test_translate(a, b):
+    arr = ARangeArray.fromList(a)
+    assert arr.translate(7).toList() == [r.translate(7) for r in a]
+    with pytest.raises(ValueError): arr.translate(-max_len)
+
+def test_expand(a, b):
+    arr = ARangeArray.fromList(a)
+    for start, end in [(2, 3), (-2, 1), (-10, -10)]:
+        try: expected = [r.expand(start, end) if not r.empty else ARange() for r in a]
+        except ValueError:
+            with pytest.raises(ValueError): arr.expand(start, end)
+            continue
+        assert arr.expand(start, end).toList() == expected
+
+def test_split(a, b):
+    arr = ARangeArray.fromList(a)
+    n = numpy.array([randrange(1, max_len + 2) for r in a])
+    left, right = arr.split(n)
+    expected = [r.split(int(i)) for r, i in zip(a, n)]
+    assert left.toList() == [e[0] for e in expected]
+    assert right.toList() == [e[1] for e in expected]
+
+def test_distance_overlaps(a, b):
+    arr = ARangeArray.fromList(a)
+    d = arr.distance(other(b))
+    for i, (r1, r2) in enumerate(zip(a, b)):
+        expected = r1.distance(r2)
+        if expected is None: assert d.mask[i]
+        else: assert d[i] == expected
+    assert list(arr.overlaps(other(b))) == [r1.overlaps(r2) for r1, r2 in zip(a, b)]
+
+def test_binary(a, b):
+    arr = ARangeArray.fromList(a)
+    o = other(b)
+    assert (arr & o).toList() == [r1 & r2 for r1, r2 in zip(a, b)]
+    for method, op in [('union', lambda x, y: x | y), ('difference', lambda x, y: x - y), ('symmetricDifference', lambda x, y: x ^ y)]:
+        result = ARangeArray.join(*getattr(arr, method)(o))
+        assert [r.asSet() for r in result] == [op(r1.asSet(), r2.asSet()) for r1, r2 in zip(a, b)]
+
+def test_comparisons(a, b):
+    arr = ARangeArray.fromList(a)
+    o = other(b)
+    assert list(arr == o) == [r1 == r2 for r1, r2 in zip(a, b)]
+    assert list(arr <= o) == [r1 <= r2 for r1, r2 in zip(a, b)]
+    assert list(arr >= o) == [r1 >= r2 for r1, r2 in zip(a, b)]
+    assert list(arr < o) == [r1 < r2 for r1, r2 in zip(a, b)]
+
+def test_overhangs(a, b):
+    pairs = [(r1, r2) for r1, r2 in zip(a, b) if not (r1.empty or r2.empty)]
+    arr = ARangeArray.fromList([p[0] for p in pairs])
+    o = ARangeArray.fromList([p[1] for p in pairs])
+    assert arr.leftOverhang(o).toList() == [r1.leftOverhang(r2) for r1, r2 in pairs]
+    assert arr.rightOverhang(o).toList() == [r1.rightOverhang(r2) for r1, r2 in pairs]
+    removed = ARangeArray.join(*arr.removeAtomic(o))
+    assert [r.asSet() for r in removed] == [r1.removeAtomic(r2).asSet() for r1, r2 in pairs]
+    inserted = ARangeArray.join(*arr.insertAtomic(o))
+    assert [r.asSet() for r in inserted] == [r1.insertAtomic(r2).asSet() for r1, r2 in pairs]
@@ -0,0 +1,65 @@
+import pytest
+import sys
+from random import randrange, sample
+sys.path.append('../')
+from ranges import ARange, SRange, RangeBitmap
+
+# Use values spanning several chunks so that all container types are exercised:
+max_len = 300000
+n_tests = 5
+
+def randomSRange(max_len):
+    values = set(sample(range(1, max_len + 1), randrange(0, 3000)))
+    for i in range(randrange(0, 50)):
+        start = randrange(1, max_len + 1)
+        values.update(range(start, min(max_len, start + randrange(0, 100000)) + 1))
+    # Build the (already consolidated) ranges directly, as SRange.fromSet is slow for large sets:
+    ranges = []
+    for i in sorted(values):
+        if ranges and (ranges[-1][1] == i - 1): ranges[-1][1] = i
+        else: ranges.append([i, i])
+    return SRange([ARange(start, end) for start, end in ranges])
+
+def pytest_generate_tests(metafunc):
+    if 'r1' not in metafunc.fixturenames: return
+    testdata = []
+    for i in range(n_tests):
+        testdata.append((randomSRange(max_len), randomSRange(max_len)))
+    metafunc.parametrize("r1,r2", testdata)
+
+def test_conversion(r1, r2):
+    b = RangeBitmap(r1)
+    assert b.toSRange().ranges == r1.ranges
+    assert len(b) == len(r1)
+    assert b.span == r1.span
+    assert b == r1
+
+def test_operations(r1, r2):
+    b1 = RangeBitmap(r1)
+    b2 = RangeBitmap(r2)
+    s1 = r1.asSet()
+    s2 = r2.asSet()
+    assert (b1 & b2).asSet() == s1 & s2
+    assert (b1 | b2).asSet() == s1 | s2
+    assert (b1 - b2).asSet() == s1 - s2
+    assert (b1 ^ b2).asSet() == s1 ^ s2
+    assert (b1 & r2).asSet() == s1 & s2
+
+def test_contains(r1, r2):
+    b = RangeBitmap(r1)
+    values = r1.asSet()
+    for i in sample(range(1, max_len + 1), 1000): assert (i in b) == (i in values)
+
+def test_container_types():
+    sparse = RangeBitmap.fromSet(range(1, 20000, 7))
+    assert sparse.containerTypes == {'array': 1, 'bitmap': 0, 'run': 0}
+    dense = RangeBitmap.fromSet(range(1, 60000, 2))
+    assert dense.containerTypes == {'array': 0, 'bitmap': 1, 'run': 0}
+    runs = RangeBitmap(SRange([ARange(1, 30000), ARange(40000, 60000)]))
+    assert runs.containerTypes == {'array': 0, 'bitmap': 0, 'run': 1}
+    assert (dense | runs).containerTypes == {'array': 0, 'bitmap': 1, 'run': 0}
+    assert (dense & ARange(1, 100)).containerTypes == {'array': 1, 'bitmap': 0, 'run': 0}
+    assert len(dense & ARange(1, 100)) == 50
+
+def test_invalid():
+    with pytest.raises(ValueError): RangeBitmap.fromSet({0, 1})
@@ -0,0 +1,98 @@
+import pytest
+import sys
+from random import randrange, sample
+sys.path.append('../')
+from ranges import ARange, SRange, RangeIndex, RangeCache
+
+max_len = 100
+n_tests = 5
+
+def randomSRange(max_len):
+    return SRange.fromSet(set(sample(range(1, max_len + 1), randrange(0, max_len + 1))))
+
+def pytest_generate_tests(metafunc):
+    if 'r1' not in metafunc.fixturenames: return
+    testdata = []
+    for i in range(n_tests):
+        testdata.append((randomSRange(max_len), randomSRange(max_len)))
+    metafunc.parametrize("r1,r2", testdata)
+
+def test_index_contains(r1, r2):
+    index = RangeIndex(r1)
+    for i in range(0, max_len + 2): assert index.contains(i) == (i in r1.asSet())
+
+def test_index_operations(r1, r2):
+    index = RangeIndex(r2)
+    assert index.intersect(r1).asSet() == (r1.asSet() & r2.asSet())
+    assert index.subtractFrom(r1).asSet() == (r1.asSet() - r2.asSet())
+    assert index.overlaps(r1) == (len(r1.asSet() & r2.asSet()) > 0)
+    assert len(index) == len(r2)
+
+def test_cache_operations(r1, r2):
+    cache = RangeCache()
+    for i in range(2):
+        assert cache.intersection(r1, r2).asSet() == (r1.asSet() & r2.asSet())
+        assert cache.union(r1, r2).asSet() == (r1.asSet() | r2.asSet())
+        assert cache.difference(r1, r2).asSet() == (r1.asSet() - r2.asSet())
+        assert cache.symmetricDifference(r1, r2).asSet() == (r1.asSet() ^ r2.asSet())
+
+def test_cache_hits():
+    cache = RangeCache()
+    ref = SRange([ARange(1, 10), ARange(20, 30)])
+    cache.intersection(ARange(5, 25), ref)
+    misses = cache.stats['misses']
+    assert cache.intersection(ARange(5, 25), ref) == SRange([ARange(5, 10), ARange(20, 25)])
+    assert cache.stats['misses'] == misses
+    assert cache.stats['hits'] >= 1
+
+def test_cache_invalidation():
+    cache = RangeCache()
+    ref = SRange([ARange(1, 10)])
+    assert cache.intersection(ARange(5, 15), ref).asSet() == set(range(5, 11))
+    ref.addRange(ARange(12, 20))
+    assert cache.intersection(ARange(5, 15), ref).asSet() == set(range(5, 11)) | set(range(12, 16))
+    assert cache.stats['segments'] == sum(max(1, e.segments) for e in cache._entries.values())
+    cache.invalidate(ref)
+    assert all(RangeIndex(ref).fingerprint not in k[1:] for k in cache._entries)
+
+def test_cache_eviction():
+    cache = RangeCache(max_segments=4)
+    for i in range(1, 10): cache.union(ARange(i), ARange(i + 20))
+    assert cache.stats['segments'] <= 4
+    assert cache.stats['evictions'] > 0
+
+def test_cache_empty_results_evicted():
+    cache = RangeCache(max_segments=10)
+    for i in range(50): cache.intersection(ARange(100 * i + 1, 100 * i + 10), ARange(100 * i + 50, 100 * i + 60))
+    assert len(cache) <= 10
+    assert cache.stats['evictions'] > 0
+    assert all(len(k[1]) == 16 for k in cache._entries)
+
+def test_fingerprint_type():
+    from ranges import fingerprint
+    with pytest.raises(TypeError): fingerprint({1, 2, 3})
+    assert fingerprint(SRange([ARange(1, 5)])) == fingerprint(ARange(1, 5))
+
+def test_cache_tracks_versions(monkeypatch):
+    import ranges
+    cache = RangeCache()
+    ref = SRange([ARange(1, 10), ARange(20, 30)])
+    cache.intersection(ARange(5, 25), ref)
+    # A hit against an unchanged reference must not rebuild its index:
+    built = []
+    original = ranges.RangeIndex.__init__
+    def counting(self, r=None):
+        built.append(r)
+        original(self, r)
+    monkeypatch.setattr(ranges.RangeIndex, '__init__', counting)
+    cache.intersection(ARange(5, 25), ref)
+    assert all(r is not ref for r in built)
+    version = ref.version
+    ref.addRange(ARange(40))
+    assert ref.version > version
+    assert cache.intersection(ARange(5, 45), ref).asSet() == set(range(5, 11)) | set(range(20, 31)) | {40}
+
+def test_index_overlap_slices(r1, r2):
+    index = RangeIndex(r1)
+    pairs = [(r.start, r.end) for r in r2.ranges]
+    assert index.overlapSlices(pairs) == [index.overlapSlice(start, end) for start, end in pairs]
@@ -0,0 +1,50 @@
+import pytest
+import os
+import subprocess
+import sys
+sys.path.append('../')
+import ranges
+
+# The import time budget for "import ranges" (in microseconds), and the modules it must not import:
+import_budget = 50000
+heavy_modules = ['asyncio', 'concurrent.futures', 'hashlib', 'json', 'numpy', 'ranges.index', 'ranges.aio', 'ranges.bitmap', 'ranges.profiling']
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def run(code, *options):
+    env = dict(os.environ, PYTHONPATH=root)
+    return subprocess.run([sys.executable] + list(options) + ['-c', code], cwd=root, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+def test_import_time():
+    # Import once first so that the timed import uses the compiled bytecode:
+    run('import ranges')
+    timings = run('import ranges', '-X', 'importtime').stderr.splitlines()
+    cumulative = [int(line.split('|')[1]) for line in timings if line.split('|')[-1].strip() == 'ranges']
+    assert len(cumulative) == 1
+    assert cumulative[0] < import_budget
+
+def test_no_heavy_imports():
+    loaded = run('import sys, ranges; print(" ".join(sys.modules.keys()))').stdout.split()
+    for module in heavy_modules: assert module not in loaded
+
+def test_lazy_attributes():
+    loaded = run('import sys, ranges; ranges.RangeBitmap; print(" ".join(sys.modules.keys()))').stdout.split()
+    assert 'ranges.bitmap' in loaded
+    assert 'asyncio' not in loaded
+    assert 'RangeCache' in dir(ranges)
+    with pytest.raises(AttributeError): ranges.NoSuchThing
+
+def test_backends():
+    from ranges import RangeIndex, ARange, SRange
+    index = RangeIndex(SRange([ARange(1, 10), ARange(20, 30), ARange(50)]))
+    values = [0, 5, 15, 20, 50, 51, 10]
+    pairs = [(1, 3), (11, 19), (9, 60), (60, 70)]
+    expected = (index.findMany(values), index.overlapSlices(pairs))
+    assert expected[0] == [-1, 0, -1, 1, 2, -1, 0]
+    with pytest.raises(ValueError): ranges.set_backend('no-such-backend')
+    pytest.importorskip('numpy')
+    try:
+        ranges.set_backend('numpy')
+        assert ranges.get_backend_name() == 'numpy'
+        assert (index.findMany(values), index.overlapSlices(pairs)) == expected
+        assert RangeIndex().findMany([1, 2]) == [-1, -1]
+    finally: ranges.set_backend('python')
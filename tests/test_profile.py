@@ -0,0 +1,65 @@
+import pytest
+import sys
+import json
+sys.path.append('../')
+import ranges
+from ranges import ARange, SRange
+
+def test_records_operations():
+    a = SRange([ARange(1, 10), ARange(20, 30)])
+    b = SRange([ARange(5, 25)])
+    with ranges.profile() as p:
+        c = a | b
+    stats = p.asDict()
+    assert stats['SRange.__or__']['calls'] == 1
+    assert stats['SRange.__or__']['segments_in'] == 3
+    assert stats['SRange.__or__']['segments_out'] == len(c.ranges)
+    assert stats['SRange.__or__']['time'] >= 0
+    assert 'SRange.consolidate' in p
+
+def test_classmethod():
+    with ranges.profile() as p:
+        r = SRange.fromSet({1, 2, 3, 7})
+    assert r.asSet() == {1, 2, 3, 7}
+    assert p['SRange.fromSet']['segments_in'] == 4
+    assert p['SRange.fromSet']['segments_out'] == 2
+
+def test_json():
+    with ranges.profile() as p:
+        ARange(1, 5) & ARange(3, 8)
+    assert json.loads(p.asJSON()) == p.asDict()
+
+def test_nested():
+    with ranges.profile() as outer:
+        ARange(1, 5) | ARange(3, 8)
+        with ranges.profile() as inner:
+            ARange(1, 5) | ARange(3, 8)
+    assert outer['ARange.__or__']['calls'] == 2
+    assert inner['ARange.__or__']['calls'] == 1
+
+def test_disabled():
+    with ranges.profile(): pass
+    assert not hasattr(SRange.__and__, '__wrapped__')
+    assert isinstance(SRange.__dict__['fromSet'], classmethod)
+    assert not hasattr(SRange.__dict__['fromSet'].__func__, '__wrapped__')
+
+def test_threads():
+    import threading
+    barrier = threading.Barrier(8)
+    def worker():
+        barrier.wait()
+        with ranges.profile() as p:
+            ARange(1, 5) | ARange(3, 8)
+    threads = [threading.Thread(target=worker) for i in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert not hasattr(ARange.__or__, '__wrapped__')
+    assert not hasattr(SRange.__and__, '__wrapped__')
+
+def test_bitmap_segments():
+    from ranges import RangeBitmap
+    a = RangeBitmap(SRange([ARange(1, 100), ARange(200, 300)]))
+    with ranges.profile() as p:
+        a & ARange(50, 250)
+    assert p['RangeBitmap.__and__']['segments_in'] == 3
+    assert p['RangeBitmap.__and__']['segments_out'] == 2
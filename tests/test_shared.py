@@ -0,0 +1,58 @@
+import pytest
+import sys
+import multiprocessing
+import pickle
+sys.path.append('../')
+from ranges import ARange, SRange, RangeIndex, SharedRangeIndex
+
+ref = SRange([ARange(1, 10), ARange(20, 30), ARange(50)])
+
+def lookup(index, values):
+    # Run in a worker process: the index arrives pickled as its shared memory block name.
+    try: return ([index.contains(v) for v in values], index.intersect(ARange(5, 25)).asSet())
+    finally: index.close()
+
+def test_views():
+    index = RangeIndex(ref)
+    starts = index.startsView
+    assert starts.readonly
+    assert starts.format == 'q'
+    assert list(starts) == [1, 20, 50]
+    assert list(index.endsView) == [10, 30, 50]
+    with pytest.raises(TypeError): starts[0] = 2
+
+def test_publish_attach():
+    with SharedRangeIndex.create(ref) as shared:
+        assert shared.owner is True
+        assert shared.ranges == ref.ranges
+        other = SharedRangeIndex.attach(shared.name)
+        try:
+            assert other.owner is False
+            assert other == RangeIndex(ref)
+            assert other.fingerprint == RangeIndex(ref).fingerprint
+            assert other.findMany([5, 15, 50]) == [0, -1, 2]
+            assert other.startsView.readonly
+            with pytest.raises(TypeError): other.startsView[0] = 2
+        finally: other.close()
+
+def test_empty():
+    with RangeIndex().publish() as shared:
+        assert shared.empty
+        assert shared.toSRange() == SRange()
+
+def test_pickle():
+    with SharedRangeIndex.create(ref) as shared:
+        data = pickle.dumps(shared)
+        assert len(data) < 200
+        other = pickle.loads(data)
+        try: assert other.ranges == ref.ranges
+        finally: other.close()
+
+def test_worker_processes():
+    values = list(range(0, 60))
+    with RangeIndex(ref).publish() as shared:
+        with multiprocessing.get_context('spawn').Pool(2) as pool:
+            results = pool.starmap(lookup, [(shared, values)] * 2)
+    for contains, intersection in results:
+        assert contains == [v in ref.asSet() for v in values]
+        assert intersection == ref.asSet() & set(range(5, 26))
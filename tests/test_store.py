@@ -0,0 +1,80 @@
+import pytest
+import sys
+import asyncio
+sys.path.append('../')
+from ranges import ARange, SRange, AsyncRangeStore
+
+ref = SRange([ARange(1, 10), ARange(20, 30), ARange(50)])
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_contains():
+    async def main():
+        async with AsyncRangeStore({'ref': ref}) as store:
+            values = list(range(0, 60))
+            results = await asyncio.gather(*[store.contains('ref', i) for i in values])
+            return store, values, results
+    store, values, results = run(main())
+    assert results == [i in ref.asSet() for i in values]
+    metrics = store.metrics
+    assert metrics['batches']['count'] == 1
+    assert metrics['batches']['queries'] == len(values)
+    assert metrics['contains']['count'] == len(values)
+
+def test_overlapping():
+    async def main():
+        async with AsyncRangeStore({'ref': ref}) as store:
+            return await asyncio.gather(store.overlapping('ref', ARange(8, 22)), store.contains('ref', 25), store.overlapping('ref', ARange(40)))
+    assert run(main()) == [[ARange(1, 10), ARange(20, 30)], True, []]
+
+def test_operations():
+    other = SRange([ARange(5, 25), ARange(50, 60)])
+    async def main():
+        async with AsyncRangeStore({'ref': ref, 'other': other}, max_workers=2) as store:
+            return await asyncio.gather(
+                store.intersection('ref', other),
+                store.union('ref', 'other'),
+                store.difference('ref', other),
+                store.symmetricDifference('ref', other)
+            )
+    results = run(main())
+    assert results[0].asSet() == ref.asSet() & other.asSet()
+    assert results[1].asSet() == ref.asSet() | other.asSet()
+    assert results[2].asSet() == ref.asSet() - other.asSet()
+    assert results[3].asSet() == ref.asSet() ^ other.asSet()
+
+def test_stored_copy():
+    r = SRange([ARange(1, 5)])
+    store = AsyncRangeStore({'r': r})
+    r.addRange(ARange(10, 20))
+    try: assert run(store.contains('r', 15)) is False
+    finally: store.close()
+
+def test_multiple_loops():
+    store = AsyncRangeStore({'ref': ref}, max_pending=1)
+    async def main():
+        return await asyncio.gather(*[store.intersection('ref', ARange(i, i + 5)) for i in range(1, 20)])
+    try:
+        for i in range(2): assert [r.asSet() for r in run(main())] == [ref.asSet() & set(range(j, j + 6)) for j in range(1, 20)]
+    finally: store.close()
+
+def test_supplied_executor():
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        async def main():
+            async with AsyncRangeStore({'ref': ref}, executor=executor) as store:
+                return await asyncio.gather(store.contains('ref', 5), store.difference('ref', ARange(1, 25)))
+        assert run(main()) == [True, SRange([ARange(26, 30), ARange(50)])]
+        # The store must not shut down an executor it does not own:
+        assert executor.submit(sum, [1, 2]).result() == 3
+
+def test_overlap_batch():
+    queries = [SRange([ARange(1, 3), ARange(25, 55)]), ARange(11, 19), ARange(9, 20), SRange()]
+    async def main():
+        async with AsyncRangeStore({'ref': ref}) as store:
+            results = await asyncio.gather(*[store.overlapping('ref', q) for q in queries])
+            return store, results
+    store, results = run(main())
+    assert results == [[ARange(1, 10), ARange(20, 30), ARange(50)], [], [ARange(1, 10), ARange(20, 30)], []]
+    assert store.metrics['batches']['count'] == 1